@@ -1,6 +1,30 @@
+import importlib
+
+_DCC = None
+
+
+def get_dcc_actions():
+    """ Get the DCC actions module for the running application.
+
+    The module is resolved once and cached in _DCC, the DCC can't change mid-process.
+
+    Returns:
+        script_tree_dcc_maya or script_tree_dcc_mobu module
+    """
+    global _DCC
+    if _DCC is None:
+        from . import ui_utils
+        if ui_utils.maya_check():
+            from . import script_tree_dcc_maya as dcc_actions
+        else:
+            from . import script_tree_dcc_mobu as dcc_actions
+        _DCC = dcc_actions
+    return _DCC
+
+
 def main(*args, **kwargs):
     try:
-        import Qt
+        importlib.import_module("Qt")
     except ImportError:
         from PySide2 import QtWidgets, QtCore
 
@@ -14,6 +38,7 @@ def main(*args, **kwargs):
         )
         box.setWhatsThis('Script Tree install error.')
         box.exec_()
+        return
 
     from . import script_tree_ui
     return script_tree_ui.main(*args, **kwargs)
@@ -21,7 +46,6 @@ def main(*args, **kwargs):
 
 def reload_module():
     import sys
-    import os
     if sys.version_info[0] >= 3:
         from importlib import reload
     else:
@@ -30,10 +54,7 @@ def reload_module():
     from . import ui_utils
     from . import script_tree_utils
 
-    if os.path.basename(sys.executable) == "maya.exe":
-        from . import script_tree_dcc_maya as dcc_actions
-    else:
-        from . import script_tree_dcc_mobu as dcc_actions
+    dcc_actions = get_dcc_actions()
 
     from . import script_tree_ui
 
@@ -6,9 +6,14 @@ import logging
 
 def set_logger():
     logger = logging.getLogger('Script-Tree')
-    logger.setLevel(logging.DEBUG)
+
+    # module reloads call this again, don't stack up another handler
+    if logger.handlers:
+        return logger
+
+    logger.setLevel(logging.INFO)
     ch = logging.StreamHandler()
-    ch.setLevel(logging.DEBUG)
+    ch.setLevel(logging.INFO)
 
     # create formatter
     formatter = logging.Formatter('%(name)s %(levelname)s: %(message)s')
@@ -9,6 +9,69 @@ import pymel.core as pm
 from script_tree.logger import log
 from script_tree import ui_utils
 
+_script_editor_cache = None  # type: QtWidgets.QTabWidget
+
+# script extension to executer tab (label, source type)
+_EXT_TO_TYPE = {
+    ".py": ("Python", "python"),
+    ".mel": ("MEL", "mel"),
+}
+
+# Creates, selects and optionally loads a new executer tab in a single trip into MEL
+_CREATE_TAB_PROC = """
+global proc string scriptTree_createAndSelectTab(string $label, string $sourceType, string $scriptPath)
+{
+    global string $gCommandExecuterTabs;
+    buildNewExecuterTab(-1, $label, $sourceType, 0);
+
+    int $tabCount = `tabLayout -q -numberOfChildren $gCommandExecuterTabs`;
+    tabLayout -e -selectTabIndex $tabCount $gCommandExecuterTabs;
+
+    string $tabs[] = `tabLayout -q -childArray $gCommandExecuterTabs`;
+    string $forms[] = `formLayout -q -childArray $tabs[$tabCount - 1]`;
+    string $cmdExec = $forms[0];
+
+    if ($scriptPath != "") {
+        cmdScrollFieldExecuter -e -loadFile $scriptPath $cmdExec;
+        renameCurrentExecuterTab($scriptPath, 0);
+    }
+    return $cmdExec;
+}
+"""
+_create_tab_proc_sourced = False
+
+
+def _mel_string(value):
+    """ Quote a python string as a MEL string literal.
+
+    Args:
+        value (str): String to quote.
+
+    Returns:
+        str of MEL string literal.
+    """
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _create_and_select_tab(label, source_type, script_path=""):
+    """ Create a new executer tab, select it and load script_path into it if given.
+
+    Args:
+        label (str): Tab label, "Python" or "MEL".
+        source_type (str): Executer source type, "python" or "mel".
+        script_path (str | ""): Script to load into the new tab.
+
+    Returns:
+        str of the new tab's cmdScrollFieldExecuter.
+    """
+    global _create_tab_proc_sourced
+    if not _create_tab_proc_sourced:
+        pm.mel.eval(_CREATE_TAB_PROC)
+        _create_tab_proc_sourced = True
+
+    return pm.mel.eval("scriptTree_createAndSelectTab({}, {}, {});".format(
+        _mel_string(label), _mel_string(source_type), _mel_string(script_path)))
+
 
 def open_script(script_path):
     """ This is pretty much a duplicate of scriptEditorPanel.mel - global proc loadFileInNewTab(),
@@ -26,28 +89,10 @@ def open_script(script_path):
 
     script_ext = os.path.splitext(script_path)[-1].lower()
 
-    # create tab
-    if script_ext == ".py":
-        pm.mel.buildNewExecuterTab(-1, "Python", "python", 0)
-    elif script_ext == ".mel":
-        pm.mel.buildNewExecuterTab(-1, "MEL", "mel", 0)
-
-    tabs = pm.melGlobals["$gCommandExecuterTabs"]
-    tabs_layout = pm.tabLayout(tabs, q=True, ca=True)
-
-    # Select newly created tab
-    tabs_len = pm.tabLayout(tabs, q=True, numberOfChildren=True)
-    pm.tabLayout(tabs, e=True, selectTabIndex=tabs_len)
-    tab = tabs_layout[-1]
-
-    # add script contents
-    cmd_exec = pm.formLayout(tab, q=True, ca=True)[0]
-    pm.cmdScrollFieldExecuter(cmd_exec, e=True, loadFile=script_path)
-
-    # print(pm.cmdScrollFieldExecuter(cmd_exec, q=True, filename=True))
+    label, source_type = _EXT_TO_TYPE.get(script_ext, _EXT_TO_TYPE[".py"])
 
-    # rename tab
-    pm.mel.eval('renameCurrentExecuterTab("{}", 0);'.format(script_path))
+    # create tab, select it, add script contents and rename it
+    cmd_exec = _create_and_select_tab(label, source_type, script_path)
 
     # hookup signals
     hookup_tab_signals(cmd_exec)
@@ -63,16 +108,7 @@ def create_new_tab(default_script_content=""):
     Returns:
         None
     """
-    pm.mel.buildNewExecuterTab(-1, "Python", "python", 0)
-
-    tabs = pm.melGlobals["$gCommandExecuterTabs"]
-    tabs_layout = pm.tabLayout(tabs, q=True, ca=True)
-
-    tabs_len = pm.tabLayout(tabs, q=True, numberOfChildren=True)
-    pm.tabLayout(tabs, e=True, selectTabIndex=tabs_len)  # select newly created tab
-
-    tab = tabs_layout[-1]
-    cmd_exec = pm.formLayout(tab, q=True, ca=True)[0]
+    cmd_exec = _create_and_select_tab("Python", "python")
 
     pm.cmdScrollFieldExecuter(cmd_exec, e=True, text=default_script_content)
 
@@ -148,19 +184,33 @@ def toggle_comment_selected_lines():
     cmd_exec = get_selected_cmd_executer()
     selected_text = pm.cmdScrollFieldExecuter(cmd_exec, q=True, selectedText=True)
 
-    comment_lines = "#" not in selected_text.split("\n")[0]
+    lines = selected_text.split("\n")
+    comment_lines = not lines[0].lstrip().startswith("#")
 
-    new_text_lines = []
-    for line in selected_text.split("\n"):
-        if comment_lines:
-            new_line = "# {}".format(line)
-        else:
-            new_line = line.replace("# ", "")
+    if comment_lines:
+        new_text = "\n".join(["# " + line for line in lines])
+    else:
+        new_text = "\n".join([_uncomment_line(line) for line in lines])
+    pm.cmdScrollFieldExecuter(cmd_exec, e=True, insertText=new_text)
 
-        new_text_lines.append(new_line)
 
-    new_text = "\n".join(new_text_lines)
-    pm.cmdScrollFieldExecuter(cmd_exec, e=True, insertText=new_text)
+def _uncomment_line(line):
+    """ Remove the leading comment marker from a line, keeping its indentation.
+
+    Args:
+        line (str): Line of script text.
+
+    Returns:
+        str of uncommented line.
+    """
+    stripped = line.lstrip()
+    if not stripped.startswith("#"):
+        return line
+
+    indent = line[:len(line) - len(stripped)]
+    if stripped.startswith("# "):
+        return indent + stripped[2:]
+    return indent + stripped[1:]
 
 
 def get_selected_script_text():
@@ -212,8 +262,8 @@ def hookup_tab_signals(cmd_exec):
         None
     """
     pm.cmdScrollFieldExecuter(cmd_exec, e=True,
-                              modificationChangedCommand=lambda x: pm.mel.executerTabModificationChanged(x))
-    pm.cmdScrollFieldExecuter(cmd_exec, e=True, fileChangedCommand=lambda x: pm.mel.executerTabFileChanged(x))
+                              modificationChangedCommand=pm.mel.executerTabModificationChanged,
+                              fileChangedCommand=pm.mel.executerTabFileChanged)
 
 
 def open_search_dialog():
@@ -257,9 +307,14 @@ def get_script_editor_widget():
     Returns:
         QWidget of maya script editor widget
     """
+    global _script_editor_cache
+    if ui_utils.is_valid_widget(_script_editor_cache):
+        return _script_editor_cache
+
     win = ui_utils.get_app_window()
     tabs = win.findChildren(QtWidgets.QTabWidget)
     for tab in tabs:
         if tab.tabText(0) == "Script Editor":
+            _script_editor_cache = tab
             return tab
     return None
@@ -3,24 +3,29 @@ __author__ = "Richard Brenick - RichardBrenick@gmail.com"
 __created__ = "2020-09-26"
 __modified__ = "2022-03-01"
 
+import codecs
+import locale
 import os
-import re
 import runpy
-import subprocess
+from collections import deque
 
-from Qt import QtCore, QtWidgets
+from Qt import QtCore, QtGui, QtWidgets
 
+import script_tree
 from script_tree import script_tree_utils as stu
 from script_tree import ui_utils
 from script_tree.logger import log
 
-if ui_utils.maya_check():
-    from script_tree import script_tree_dcc_maya as dcc_actions
-else:
-    from script_tree import script_tree_dcc_mobu as dcc_actions
+dcc_actions = script_tree.get_dcc_actions()
 
 lk = stu.ScriptTreeConstants
 
+# appended to each search term to build the model name filters, "*term" + "*.py"
+_FILTER_GLOB_SUFFIXES = ("*.py", "*.mel")
+
+# backslash to forward slash translation table for paths
+_BS_TO_FS = str.maketrans("\\", "/")
+
 
 class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
     docking_object_name = "ScriptTreeWindow"
@@ -35,13 +40,26 @@ class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
         super(ScriptTreeWindow, self).__init__(*args, **kwargs)
         self.setWindowTitle(lk.window_text)
 
+        self._actions_built = False
+
+        self._build_core()
+
+    def _build_core(self):
+        """ Build the tree widget, context menu and filter timer, read settings and restore the script folder.
+
+        Returns:
+            None
+        """
         self.ui = ScriptTreeWidget()
         self.apply_ui_widget(self.ui)
 
-        self.recently_closed_scripts = []
+        self.recently_closed_scripts = deque(maxlen=32)
 
         self.settings = stu.ScriptEditorSettings()
 
+        # name filters currently applied to the model
+        self._last_filters = self.ui.default_filter
+
         self.context_menu_actions = [
             {"Run Script": self.action_run_script},
             {"Edit Script": self.action_open_script},
@@ -61,6 +79,27 @@ class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
             {"Backup Script Tree": self.action_backup_tree}
         ]
 
+        # setup QTimer for script filtering (so we don't immediately search for every character)
+        self.filter_timer = QtCore.QTimer()
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.timeout.connect(self.filter_results)
+
+        self.setup_connections()
+
+        # read folder from settings, otherwise set to default folder
+        folder_path = self.settings.value(stu.ScriptEditorSettings.k_folder_path, defaultValue=lk.default_script_folder)
+        self.action_set_folder(folder_path)
+
+    def _build_actions(self):
+        """ Build menus and shortcut actions and hand them to the script editor. Only needed once the window is shown.
+
+        Returns:
+            None
+        """
+        if self._actions_built:
+            return
+        self._actions_built = True
+
         # MotionBuilder crashes on menuBar for some reason
         file_menu = self.menuBar().addMenu("File") if ui_utils.maya_check() else None
         edit_menu = self.menuBar().addMenu("Edit") if ui_utils.maya_check() else None
@@ -93,23 +132,26 @@ class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
         self.create_action("Ctrl+/", text="Toggle Comment",
                            command=dcc_actions.toggle_comment_selected_lines, menu=edit_menu)
 
-        self.setup_connections()
+        # hook up shortcut actions to the script editor widget after everything is loaded and the widget might exist
+        dcc_actions.eval_deferred(self.add_actions_to_script_editor)
 
-        # read folder from settings, otherwise set to default folder
-        folder_path = self.settings.value(stu.ScriptEditorSettings.k_folder_path, defaultValue=lk.default_script_folder)
-        self.action_set_folder(folder_path)
+    def showEvent(self, event):
+        """ Build the actions the first time the window is shown.
 
-        # setup QTimer for script filtering (so we don't immediately search for every character)
-        self.filter_timer = QtCore.QTimer()
-        self.filter_timer.setSingleShot(True)
-        self.filter_timer.timeout.connect(self.filter_results)
+        Args:
+            event (QtGui.QShowEvent): Show event.
 
-        # hook up shortcut actions to the script editor widget after everything is loaded and the widget might exist
-        dcc_actions.eval_deferred(self.add_actions_to_script_editor)
+        Returns:
+            None
+        """
+        self._build_actions()
+        super(ScriptTreeWindow, self).showEvent(event)
 
     def create_action(self, shortcut, command=None, text="", menu=None):
         """ Create right click button action.
 
+        Items without a menu entry only need the key binding, so they get a QShortcut instead of a QAction.
+
         Args:
             shortcut (str): shortcut to trigger command.
             command (function | None): Function to run on trigger.
@@ -117,7 +159,23 @@ class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
             menu (Qmenu | None): Name of menu to add action too.
 
         Returns:
+            QtWidgets.QAction or QtWidgets.QShortcut
+        """
+        if menu:
+            return self._make_action(shortcut, command, text, menu)
+        return self._make_shortcut(shortcut, command, self)
+
+    def _make_action(self, shortcut, command=None, text="", menu=None):
+        """ Create QAction with a shortcut and add it to the window and menu.
 
+        Args:
+            shortcut (str): shortcut to trigger command.
+            command (function | None): Function to run on trigger.
+            text (str | ""): Test name of command.
+            menu (Qmenu | None): Name of menu to add action too.
+
+        Returns:
+            QtWidgets.QAction
         """
         shortcut_action = QtWidgets.QAction(self)
         shortcut_action.setShortcut(shortcut)
@@ -129,6 +187,25 @@ class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
             shortcut_action.setText(text)
         if menu:
             menu.addAction(shortcut_action)
+        return shortcut_action
+
+    @staticmethod
+    def _make_shortcut(shortcut, command, parent_widget):
+        """ Create QShortcut that only triggers while parent_widget or its children have focus.
+
+        Args:
+            shortcut (str): shortcut to trigger command.
+            command (function | None): Function to run on trigger.
+            parent_widget (QtWidgets.QWidget): Widget the shortcut is bound to.
+
+        Returns:
+            QtWidgets.QShortcut
+        """
+        key_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence(shortcut), parent_widget)
+        key_shortcut.setContext(QtCore.Qt.WidgetWithChildrenShortcut)
+        if command:
+            key_shortcut.activated.connect(command)
+        return key_shortcut
 
     def add_actions_to_script_editor(self):
         """ Add actions to script editor widget.
@@ -139,8 +216,7 @@ class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
         dcc_script_editor_widget = dcc_actions.get_script_editor_widget() # type: QtWidgets.QTabWidget
         if not dcc_script_editor_widget:
             return
-        for action in self.actions():
-            dcc_script_editor_widget.addAction(action)
+        dcc_script_editor_widget.addActions(self.actions())
 
     def setup_connections(self):
         """ Setup connections for tree items.
@@ -164,7 +240,7 @@ class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
         Returns:
             QMenu with items added.
         """
-        return ui_utils.build_menu_from_action_list(self.context_menu_actions)
+        return ui_utils.build_menu_from_action_list(self.context_menu_actions, parent=self)
 
     # signaled from ui
     def _user_input_filter(self):
@@ -182,17 +258,29 @@ class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
             None
         """
 
-        filter_text = re.sub(r'[^\x00-\x7F]+', '', self.ui.search_bar.text())  # strip unicode characters until py3
+        # strip unicode characters until py3
+        filter_text = self.ui.search_bar.text().encode('ascii', 'ignore').decode('ascii')
+
+        # very short searches match almost everything, keep the current filter until there's more to go on
+        if 0 < len(filter_text) < lk.user_input_filter_min_length:
+            return
+
+        if not filter_text:
+            filters = self.ui.default_filter
+        else:
+            filters = ["*" + filter_string.replace(" ", "") + glob_suffix
+                       for filter_string in filter_text.split(",")
+                       for glob_suffix in _FILTER_GLOB_SUFFIXES]
+
+        # setNameFilters makes the model re-walk the tree, so skip it if nothing changed
+        if filters == self._last_filters:
+            return
+        self._last_filters = filters
 
         if not filter_text:
-            self.ui.model.setNameFilters(self.ui.default_filter)
+            self.ui.model.setNameFilters(filters)
             self.ui.tree_view.collapseAll()
         else:
-            filters = []
-            for filter_string in filter_text.split(","):
-                filter_string = filter_string.replace(" ", "")
-                filters.append("*{}*.py".format(filter_string))
-                filters.append("*{}*.mel".format(filter_string))
             self.ui.tree_view.expandAll()
             self.ui.model.setNameFilters(filters)
 
@@ -236,11 +324,10 @@ class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
                 return
 
         else:
+            if self.ui.get_selected_is_dir():
+                return
             script_path = self.ui.get_selected_path()
 
-        if os.path.isdir(script_path):
-            return
-
         dcc_actions.open_script(script_path)
         log.info("Opened: {}".format(script_path))
 
@@ -263,7 +350,8 @@ class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
             if not script_path:
                 return
 
-        stu.backup_script(script_path)
+        # copy the backup on a worker thread while the DCC writes the script
+        QtCore.QThreadPool.globalInstance().start(_BackupRunnable(script_path))
         dcc_actions.save_selected_tab(script_path)
 
     def action_close_tab(self):
@@ -347,9 +435,9 @@ class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
         Returns:
             None
         """
-        if not len(self.recently_closed_scripts):
+        if not self.recently_closed_scripts:
             return
-        recent_script_path = self.recently_closed_scripts.pop(-1)
+        recent_script_path = self.recently_closed_scripts.pop()
         if recent_script_path:  # recent_script_path may be an empty string if it doesn't have a path defined
             dcc_actions.open_script(recent_script_path)
 
@@ -359,23 +447,20 @@ class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
         Returns:
             None
         """
-        file_path = self.ui.get_selected_path()
-        if os.path.isdir(file_path):
+        if self.ui.get_selected_is_dir():
             return
+        file_path = self.ui.get_selected_path()
 
         if file_path.endswith(".py"):
-            cmd = "import runpy; runpy.run_path('{}', init_globals=globals(), run_name='__main__')".format(file_path)
-            exec_command = 'python("{}")'.format(cmd)
             runpy.run_path(file_path, init_globals=globals(), run_name="__main__")
+            log.info("Executed: {}".format(file_path))
+
+            exec_command = ("python(\"import runpy;"
+                            "runpy.run_path(r'{}',init_globals=globals(),run_name='__main__')\")".format(file_path))
+            dcc_actions.add_to_repeat_commands(exec_command)
 
         elif file_path.endswith(".mel"):
             log.warning("TODO: add Mel support")
-            exec_command = ""
-        else:
-            exec_command = ""
-
-        log.info("Executed: {}".format(file_path))
-        dcc_actions.add_to_repeat_commands(exec_command)
 
     def action_setup_double_click_connections(self):
         """ Switch between opening or running the script on double click.
@@ -397,6 +482,42 @@ class ScriptTreeWindow(ui_utils.DockableWidget, QtWidgets.QMainWindow):
             self.ui.tree_view.doubleClicked.connect(self.action_run_script)
 
 
+class _BackupRunnable(QtCore.QRunnable):
+    def __init__(self, script_path):
+        """ Back up a script on a QThreadPool thread.
+
+        The current contents are cloned, or else read, here on the calling thread, so the backup
+        still holds the previous version if the script is overwritten before run() happens.
+
+        Args:
+            script_path (str): Path of script.
+        """
+        super(_BackupRunnable, self).__init__()
+        self.script_path = script_path
+        self.script_data = None
+
+        if stu.clone_backup_script(script_path):
+            return  # the clone is already the backup, nothing left for run()
+
+        if os.path.isfile(script_path):
+            try:
+                with open(script_path, "rb") as fh:
+                    self.script_data = fh.read()
+            except Exception as e:
+                # skip the backup rather than block the save
+                log.error(e)
+
+    def run(self):
+        """ Write the backup.
+
+        Returns:
+            None
+        """
+        if self.script_data is None:
+            return
+        stu.backup_script(self.script_path, script_data=self.script_data)
+
+
 class ScriptTreeWidget(QtWidgets.QWidget):
     def __init__(self, *args, **kwargs):
         """ Script tree widget.
@@ -423,7 +544,13 @@ class ScriptTreeWidget(QtWidgets.QWidget):
         self.model.setNameFilters(self.default_filter)
         self.model.setNameFilterDisables(False)
 
+        # Qt 5.14+, skip reading desktop.ini per folder for custom icons.
+        # File watching stays on so scripts saved from the editor show up in the tree.
+        if hasattr(QtWidgets.QFileSystemModel, "DontUseCustomDirectoryIcons"):
+            self.model.setOption(QtWidgets.QFileSystemModel.DontUseCustomDirectoryIcons, True)
+
         self.tree_view = QtWidgets.QTreeView()
+        self.tree_view.setUniformRowHeights(True)
         self.tree_view.setModel(self.model)
         # self.tree_view.setRootIndex(self.model.index(self.folder))
 
@@ -457,7 +584,15 @@ class ScriptTreeWidget(QtWidgets.QWidget):
         """
         index = self.tree_view.currentIndex()
         file_path = self.model.filePath(index)
-        return file_path.replace("\\", "/")
+        return file_path.translate(_BS_TO_FS) if "\\" in file_path else file_path
+
+    def get_selected_is_dir(self):
+        """ Check if the selected item is a directory, using the model instead of the file system.
+
+        Returns:
+            True if selected item is a directory.
+        """
+        return self.model.isDir(self.tree_view.currentIndex())
 
     def get_script_folder(self):
         """ Get script folder path.
@@ -508,10 +643,20 @@ class SearchDialog(QtWidgets.QDialog):
         self.search_BTN = QtWidgets.QPushButton("Search")
         self.search_BTN.clicked.connect(self.start_search)
 
+        self.results_TE = QtWidgets.QPlainTextEdit()
+        self.results_TE.setReadOnly(True)
+
+        # findstr runs async so the UI doesn't freeze while it walks the tree
+        self.proc = QtCore.QProcess(self)
+        self.proc.readyReadStandardOutput.connect(self._append_results)
+        self.proc.finished.connect(self._search_finished)
+        self.proc.errorOccurred.connect(self._search_failed)
+
         main_layout.addWidget(desc_label)
         main_layout.addWidget(self.folder_LE)
         main_layout.addWidget(self.search_text_LE)
         main_layout.addWidget(self.search_BTN)
+        main_layout.addWidget(self.results_TE)
 
         self.setLayout(main_layout)
         self.setWindowTitle("Search ScriptTree")
@@ -522,17 +667,59 @@ class SearchDialog(QtWidgets.QDialog):
         Returns:
             None
         """
+        if self.proc.state() != QtCore.QProcess.NotRunning:
+            return
+
         root_folder = self.folder_LE.text()
         str_to_find = self.search_text_LE.text()
         log.info("Searching {} for '{}'".format(root_folder, str_to_find))
 
-        proc = subprocess.Popen("findstr /s /n " + str_to_find + " *.py *.mel",
-                                cwd=root_folder,
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE)
-        std_out_data, std_err_data = proc.communicate()
-        log.info("Search Results:\n")
-        log.info(std_out_data)
+        self.results_TE.clear()
+        self.search_BTN.setEnabled(False)
+
+        # findstr writes in the console code page, and a character can be split across output chunks
+        self._decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))("replace")
+
+        # argv list, no shell. /c: makes findstr treat the string literally, spaces included
+        self.proc.setWorkingDirectory(root_folder)
+        self.proc.start("findstr", ["/s", "/n", "/c:" + str_to_find, "*.py", "*.mel"])
+
+    def _append_results(self):
+        """ Add available search output to the results.
+
+        Returns:
+            None
+        """
+        output = self._decoder.decode(bytes(self.proc.readAllStandardOutput()))
+        self.results_TE.moveCursor(QtGui.QTextCursor.End)
+        self.results_TE.insertPlainText(output)
+
+    def _search_finished(self, *args):
+        """ Re-enable searching once findstr has exited.
+
+        Returns:
+            None
+        """
+        # flush whatever the decoder is still holding
+        remaining_output = self._decoder.decode(b"", final=True)
+        if remaining_output:
+            self.results_TE.moveCursor(QtGui.QTextCursor.End)
+            self.results_TE.insertPlainText(remaining_output)
+
+        self.search_BTN.setEnabled(True)
+        log.info("Search finished")
+
+    def _search_failed(self, error):
+        """ Re-enable searching if findstr could not be run.
+
+        Args:
+            error (QtCore.QProcess.ProcessError): Process error.
+
+        Returns:
+            None
+        """
+        self.search_BTN.setEnabled(True)
+        log.error("Search failed: {}".format(self.proc.errorString()))
 
 
 def main(restore=False, force_refresh=False):
@@ -1,25 +1,94 @@
 """ Script Tree utilities"""
 
+import functools
+import itertools
 import os
+import pathlib
 import shutil
+import stat
 import subprocess
+import sys
 import time
 
 from Qt import QtCore
 
+import script_tree
 from script_tree import ui_utils
 from script_tree.logger import log
 
-if ui_utils.maya_check():
-    from . import script_tree_dcc_maya as dcc_actions
-    dcc_name = "Maya"
-else:
-    from . import script_tree_dcc_mobu as dcc_actions
-    dcc_name = "Motionbuilder"
+dcc_actions = script_tree.get_dcc_actions()
+dcc_name = "Maya" if ui_utils.maya_check() else "Motionbuilder"
 
 settings_name = "script_tree_" + dcc_name.lower()
 
 
+def _get_windows_documents_folder():
+    """ Get the Documents known folder from the Windows shell, this follows folder redirection and localization.
+
+    Returns:
+        str of documents folder or None if it couldn't be found.
+    """
+    import ctypes
+    import uuid
+    from ctypes import wintypes
+
+    class GUID(ctypes.Structure):
+        _fields_ = [("Data1", wintypes.DWORD),
+                    ("Data2", wintypes.WORD),
+                    ("Data3", wintypes.WORD),
+                    ("Data4", ctypes.c_ubyte * 8)]
+
+    folder_id = GUID.from_buffer_copy(uuid.UUID("{FDD39AD0-238F-46AF-ADB4-6C85480369C7}").bytes_le)  # FOLDERID_Documents
+    path_ptr = ctypes.c_wchar_p()
+    try:
+        if ctypes.windll.shell32.SHGetKnownFolderPath(ctypes.byref(folder_id), 0, None, ctypes.byref(path_ptr)) != 0:
+            return None
+        return path_ptr.value
+    finally:
+        ctypes.windll.ole32.CoTaskMemFree(path_ptr)
+
+
+def _get_xdg_documents_folder():
+    """ Get XDG_DOCUMENTS_DIR from the user's user-dirs.dirs file.
+
+    Returns:
+        str of documents folder or None if it isn't set.
+    """
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    try:
+        with open(os.path.join(config_home, "user-dirs.dirs")) as fh:
+            for line in fh:
+                if line.startswith("XDG_DOCUMENTS_DIR="):
+                    value = line.split("=", 1)[1].strip().strip('"')
+                    return value.replace("$HOME", os.path.expanduser("~"))
+    except (IOError, OSError):
+        pass
+    return None
+
+
+def _get_documents_folder():
+    """ Get the user's documents folder.
+
+    Returns:
+        str of documents folder.
+    """
+    documents_folder = None
+    try:
+        if sys.platform == "win32":
+            documents_folder = _get_windows_documents_folder()
+        else:
+            documents_folder = _get_xdg_documents_folder()
+    except Exception as e:
+        log.warning("Unable to look up documents folder: {}".format(e))
+
+    if not documents_folder:
+        documents_folder = str(pathlib.Path.home() / "Documents")
+    return documents_folder
+
+
+_DOCS_DIR = _get_documents_folder()
+
+
 class GlobalCache:
     shortcuts = []
 
@@ -30,17 +99,17 @@ class ScriptTreeConstants:
     script_tree_folder_name = "ScriptTree"
     default_folder_name = "Scripts"
 
-    user_documents_folder = os.path.expanduser('~/')
-    if "documents" not in user_documents_folder.lower():  # Standalone interpreter goes to username folder not documents
-        user_documents_folder += "/Documents"
+    user_documents_folder = _DOCS_DIR
 
-    script_tree_folder = os.path.join(user_documents_folder, script_tree_folder_name, dcc_name).replace("\\", "/")
-    default_script_folder = os.path.join(script_tree_folder, default_folder_name).replace("\\", "/")
+    _script_tree_path = pathlib.PurePath(user_documents_folder, script_tree_folder_name, dcc_name)
+    script_tree_folder = _script_tree_path.as_posix()
+    default_script_folder = (_script_tree_path / default_folder_name).as_posix()
     # default_script_folder = "M:/Art/Tools/{}/Scripts".format(dcc_name)
-    script_backup_folder = os.path.join(script_tree_folder, "ScriptTree_ScriptBackup").replace("\\", "/")
-    tree_backup_folder = os.path.join(script_tree_folder, "ScriptTree_TreeBackup").replace("\\", "/")
+    script_backup_folder = (_script_tree_path / "ScriptTree_ScriptBackup").as_posix()
+    tree_backup_folder = (_script_tree_path / "ScriptTree_TreeBackup").as_posix()
 
     user_input_filter_delay = 200
+    user_input_filter_min_length = 2
 
     default_script_content = "import pymel.core as pm"
 
@@ -49,44 +118,182 @@ class ScriptTreeConstants:
 
 
 class ScriptEditorSettings(QtCore.QSettings):
-    """ Script Tree Settings """
+    """ Script Tree Settings
+
+    Every ScriptEditorSettings() call returns the same instance so the ini file is only opened once
+    and the value cache is shared. Like any QSettings object, only use it from the main thread.
+    """
     k_window_layout = "window/layout"
     k_folder_path = "script_tree/folder_path"
     k_double_click_action = "script_tree/double_click_action"
+    k_prefer_reflink = "script_tree/prefer_reflink"
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if ScriptEditorSettings._instance is None:
+            ScriptEditorSettings._instance = super(ScriptEditorSettings, cls).__new__(cls)
+        return ScriptEditorSettings._instance
 
     def __init__(self):
+        if "_cache" in self.__dict__:  # shared instance is already set up
+            return
+
         super(ScriptEditorSettings, self).__init__(
             QtCore.QSettings.IniFormat,
             QtCore.QSettings.UserScope,
             'ScriptTree',
             settings_name  # saves in %APPDATA%\ScriptTree\script_tree_maya.ini
         )
+        # in-memory copy of values read or written through this object
+        self._cache = {}
 
+    def value(self, key, defaultValue=None, *args, **kwargs):
+        """ Get settings value, reading from the in-memory cache when possible.
 
-def open_path_in_explorer(file_path):
-    """ Open file in file manager.
+        Args:
+            key (str): Setting name.
+            defaultValue (object | None): Value to return if the setting doesn't exist.
+
+        Returns:
+            Setting value or defaultValue.
+        """
+        if args or kwargs:  # type conversion requested, leave that to QSettings
+            return super(ScriptEditorSettings, self).value(key, defaultValue, *args, **kwargs)
+
+        if key not in self._cache:
+            self._cache[key] = super(ScriptEditorSettings, self).value(key)
+
+        cached_value = self._cache[key]
+        return defaultValue if cached_value is None else cached_value
+
+    def setValue(self, key, value):
+        """ Set settings value and update the in-memory cache.
+
+        Args:
+            key (str): Setting name.
+            value (object): Value to store.
+
+        Returns:
+            None
+        """
+        super(ScriptEditorSettings, self).setValue(key, value)
+        self._cache[key] = value
+
+    def remove(self, key):
+        """ Remove setting and drop it from the in-memory cache.
+
+        Args:
+            key (str): Setting name.
+
+        Returns:
+            None
+        """
+        super(ScriptEditorSettings, self).remove(key)
+        self._cache.pop(key, None)
+
+
+# File manager launcher for the current platform, picked once at import
+if sys.platform == "win32":
+    def _open_in_file_manager(file_path, is_dir):
+        file_path = file_path.replace("/", "\\")
+        if is_dir:
+            subprocess.Popen(["explorer", file_path])
+        else:
+            subprocess.Popen(["explorer", "/select,", file_path])
+
+elif sys.platform == "darwin":
+    def _open_in_file_manager(file_path, is_dir):
+        if is_dir:
+            subprocess.Popen(["open", file_path])
+        else:
+            subprocess.Popen(["open", "-R", file_path])
+
+else:
+    def _open_in_file_manager(file_path, is_dir):
+        subprocess.Popen(["xdg-open", file_path if is_dir else os.path.dirname(file_path)])
+
+
+# Copy-on-write file cloning for the current platform. Clones share the source's data blocks
+# until either file changes, so backups on the same filesystem take no time or space.
+if sys.platform.startswith("linux"):
+    import fcntl
+
+    _FICLONE = 0x40049409
+
+    def _clone_fd(src_fd, dst_fd):
+        try:
+            fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+            return True
+        except OSError:  # different filesystems, or no reflink support
+            return False
+
+    def _clone_file(src, dst):
+        with open(src, "rb") as src_fh, open(dst, "wb") as dst_fh:
+            return _clone_fd(src_fh.fileno(), dst_fh.fileno())
+
+elif sys.platform == "darwin":
+    import ctypes
+
+    _clonefile = getattr(ctypes.CDLL(None, use_errno=True), "clonefile", None)  # macOS 10.12+
+
+    def _clone_fd(src_fd, dst_fd):
+        return False
+
+    def _clone_file(src, dst):
+        if _clonefile is None or os.path.lexists(dst):  # clonefile won't overwrite
+            return False
+        return _clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+
+else:
+    def _clone_fd(src_fd, dst_fd):
+        return False
+
+    def _clone_file(src, dst):
+        return False
+
+
+def prefer_reflink():
+    """ Check the settings for whether backups should try copy-on-write cloning first.
+
+    Returns:
+        True unless turned off in ScriptEditorSettings.
+    """
+    value = ScriptEditorSettings().value(ScriptEditorSettings.k_prefer_reflink, defaultValue=True)
+    return value not in (False, 0, "false", "0")
+
+
+def _copy_file(src, dst, reflink=False):
+    """ Copy file contents, cloning instead when possible.
 
     Args:
-        file_path (str): Path ot launch from.
+        src (str): Path to copy from.
+        dst (str): Path to copy to.
+        reflink (bool | False): Try a copy-on-write clone before copying.
 
     Returns:
         None
     """
-    if os.path.isdir(file_path):
-        file_path += "/"
+    if reflink and _clone_file(src, dst):
+        return
+    shutil.copyfile(src, dst)
 
-    file_path = file_path.replace("/", "\\")  # wow, I don't think I've done this intentionally before
 
-    # Try and launch like we are in windows and cycle all OS.
-    try:
-        try:
-            subprocess.Popen(r'open /select, "{}"'.format(file_path))
+def open_path_in_explorer(file_path):
+    """ Open file in file manager.
 
-        except OSError:
-            subprocess.Popen(['xdg-open', file_path])
+    Folders are opened, files are selected in their folder where the file manager supports it.
 
-    except OSError:
-        subprocess.Popen(['open', file_path])
+    Args:
+        file_path (str): Path ot launch from.
+
+    Returns:
+        None
+    """
+    try:
+        _open_in_file_manager(file_path, os.path.isdir(file_path))
+    except OSError as e:
+        log.error("Unable to open file manager: {}".format(e))
 
 
 def get_backup_folder_for_script(script_path):
@@ -98,39 +305,114 @@ def get_backup_folder_for_script(script_path):
     Returns:
         str to backup script directory.
     """
+    return _get_backup_folder_for_script_name(os.path.basename(script_path))
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_backup_folder_for_script_name(script_name):
+    """ Get backup script folder for a script file name, cached since the result never changes.
+
+    Args:
+        script_name (str): Script file name with extension.
+
+    Returns:
+        str to backup script directory.
+    """
+    file_name, file_extension = os.path.splitext(script_name)
+    return ScriptTreeConstants.script_backup_folder + "/" + file_name
+
+
+# Appended to backup names so backups taken in the same second don't overwrite each other
+_backup_counter = itertools.count()
+
+
+def get_unique_time():
+    """ Get timestamp used to make backup names unique. Get it once and reuse it when backing up in bulk.
+
+    Returns:
+        str of current time in whole seconds.
+    """
+    return str(int(time.time()))
+
+
+def get_backup_file_path(script_path, unique_time):
+    """ Get path of the backup file for a script.
+
+    Args:
+        script_path (str): Path of script.
+        unique_time (str): Timestamp for the backup name, a running counter is added after it.
+
+    Returns:
+        str of backup file path.
+    """
     file_name, file_extension = os.path.splitext(os.path.basename(script_path))
-    backup_dir = os.path.join(ScriptTreeConstants.script_backup_folder, file_name)
-    return backup_dir
+    backup_file_name = file_name + "_BACKUP_{}_{}".format(unique_time, next(_backup_counter)) + file_extension
+    return os.path.join(get_backup_folder_for_script(script_path), backup_file_name)
 
 
-def backup_script(script_path):
+def backup_script(script_path, script_data=None, unique_time=None):
     """ Backup script
 
     Args:
         script_path (str): Path of script.
+        script_data (bytes | None): Contents to write to the backup instead of copying script_path.
+        unique_time (str | None): Timestamp for the backup name, from get_unique_time() if not given.
 
     Returns:
         None
     """
-    if not os.path.exists(script_path):
+    if script_data is None and not os.path.exists(script_path):
         return
 
     try:
-        file_name, file_extension = os.path.splitext(os.path.basename(script_path))
+        if unique_time is None:
+            unique_time = get_unique_time()
+        backup_file_path = get_backup_file_path(script_path, unique_time)
+
+        os.makedirs(os.path.dirname(backup_file_path), exist_ok=True)
 
-        unique_time = str(int(time.time()))
-        backup_file_name = file_name + "_BACKUP_{}".format(unique_time) + file_extension
+        if script_data is None:
+            _copy_file(script_path, backup_file_path, prefer_reflink())  # backups don't need the original's metadata
+        else:
+            with open(backup_file_path, "wb") as fh:
+                fh.write(script_data)
 
-        backup_file_path = os.path.join(get_backup_folder_for_script(script_path), backup_file_name)
+    except Exception as e:
+        log.error(e)
 
-        if not os.path.exists(os.path.dirname(backup_file_path)):
-            os.makedirs(os.path.dirname(backup_file_path))
 
-        shutil.copy2(script_path, backup_file_path)
+def clone_backup_script(script_path, unique_time=None):
+    """ Backup script with a copy-on-write clone, which snapshots the current contents straight away.
 
-    except Exception as e:
+    Args:
+        script_path (str): Path of script.
+        unique_time (str | None): Timestamp for the backup name, from get_unique_time() if not given.
+
+    Returns:
+        True if the backup was cloned, False if it has to be copied another way.
+    """
+    if not prefer_reflink() or not os.path.isfile(script_path):
+        return False
+
+    try:
+        if unique_time is None:
+            unique_time = get_unique_time()
+        backup_file_path = get_backup_file_path(script_path, unique_time)
+
+        os.makedirs(os.path.dirname(backup_file_path), exist_ok=True)
+
+        if _clone_file(script_path, backup_file_path):
+            return True
+
+        # a failed FICLONE leaves an empty file behind
+        if os.path.exists(backup_file_path):
+            os.remove(backup_file_path)
+
+    except OSError as e:
         log.error(e)
 
+    return False
+
 
 def backup_tree(script_folder):
     """ Backup script tree by copying folder to backup location.
@@ -141,8 +423,7 @@ def backup_tree(script_folder):
     Returns:
         None
     """
-    unique_time = str(int(time.time()))
-    backup_directory_name = "ScriptTree_BACKUP_{}".format(unique_time)
+    backup_directory_name = "ScriptTree_BACKUP_{}_{}".format(get_unique_time(), next(_backup_counter))
     backup_directory_path = os.path.join(ScriptTreeConstants.tree_backup_folder, backup_directory_name)
 
     copy_directory(script_folder, backup_directory_path)
@@ -150,33 +431,186 @@ def backup_tree(script_folder):
     log.info("ScriptTree Network Folder Saved: {}".format(backup_directory_path))
 
 
-def copy_directory(src, dst, symlinks=False, ignore=None):
+def copy_directory(src, dst, symlinks=False, ignore=None, reflink=None):
     """ Copy directory
 
+    Uses robocopy on Windows, an fd based os.fwalk copy on Linux and shutil.copytree elsewhere,
+    falling back to a python copy loop when none of those can be used.
+
     Args:
         src (str): Path to script.
         dst (str): Path of script directory
         symlinks (bool | False):
         ignore (list | None): List of files to ignore.
+        reflink (bool | None): Try copy-on-write cloning for files in the Linux copy, read from settings if None.
 
     Returns:
         None
     """
+    if os.name == "nt" and ignore is None:
+        if _robocopy_directory(src, dst, symlinks):
+            return
+
+    elif ignore is None and hasattr(os, "fwalk") and hasattr(os, "copy_file_range"):
+        if reflink is None:
+            reflink = prefer_reflink()
+        _fwalk_copy_directory(src, dst, symlinks, reflink)
+        return
+
+    elif sys.version_info >= (3, 8):
+        shutil.copytree(src, dst, symlinks, ignore, dirs_exist_ok=True)
+        return
+
     if not os.path.exists(dst):
         os.makedirs(dst)
 
-    for item in os.listdir(src):
-        s = os.path.join(src, item)
-        d = os.path.join(dst, item)
+    # scandir entries carry their file type, so is_dir doesn't need another stat per item
+    with os.scandir(src) as entries:
+        dst_prefix = dst + os.sep
+        for entry in entries:
+            d = dst_prefix + entry.name
 
-        if os.path.isdir(s):
-            shutil.copytree(s, d, symlinks, ignore)
-        else:
-            shutil.copy2(s, d)
+            if entry.is_dir():
+                # robocopy may have copied part of the tree before failing, so d can already exist
+                if sys.version_info >= (3, 8):
+                    shutil.copytree(entry.path, d, symlinks, ignore, dirs_exist_ok=True)
+                else:
+                    shutil.copytree(entry.path, d, symlinks, ignore)
+            else:
+                shutil.copy2(entry.path, d)
+
+
+def _fwalk_copy_directory(src, dst, symlinks=False, reflink=False):
+    """ Copy directory by walking it with os.fwalk and copying files relative to each directory's fd.
+
+    Files go through os.copy_file_range, which stays in the kernel and lets filesystems
+    that support it (Btrfs, XFS, NFS) clone or copy server side.
+
+    Args:
+        src (str): Path to copy from.
+        dst (str): Path to copy to.
+        symlinks (bool | False): Copy symbolic links as links instead of their targets.
+        reflink (bool | False): Try a copy-on-write clone for each file before copying.
+
+    Returns:
+        None
+    """
+    copied_dirs = []
+    for dir_path, dir_names, file_names, dir_fd in os.fwalk(src, follow_symlinks=not symlinks):
+        rel_path = os.path.relpath(dir_path, src)
+        dst_dir = dst if rel_path == os.curdir else dst + os.sep + rel_path
+        os.makedirs(dst_dir, exist_ok=True)
+        copied_dirs.append((dst_dir, os.fstat(dir_fd)))
+
+        if symlinks:
+            # linked folders are recreated as links and not walked into
+            linked_dir_names = [name for name in dir_names if _is_link_at(name, dir_fd)]
+            for name in linked_dir_names:
+                os.symlink(os.readlink(name, dir_fd=dir_fd), dst_dir + os.sep + name)
+                dir_names.remove(name)
+
+        for name in file_names:
+            dst_file = dst_dir + os.sep + name
+            if symlinks and _is_link_at(name, dir_fd):
+                os.symlink(os.readlink(name, dir_fd=dir_fd), dst_file)
+            else:
+                _copy_file_at(name, dir_fd, dst_file, reflink)
+
+    # like copytree, set folder permissions and times once their contents are in place, deepest first
+    for dst_dir, src_stat in reversed(copied_dirs):
+        os.chmod(dst_dir, stat.S_IMODE(src_stat.st_mode))
+        os.utime(dst_dir, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+
+def _is_link_at(name, dir_fd):
+    """ Check if name in the directory open as dir_fd is a symbolic link.
+
+    Args:
+        name (str): Entry name.
+        dir_fd (int): File descriptor of the containing directory.
+
+    Returns:
+        True if entry is a symbolic link.
+    """
+    return stat.S_ISLNK(os.stat(name, dir_fd=dir_fd, follow_symlinks=False).st_mode)
+
+
+def _copy_file_at(name, dir_fd, dst_file, reflink=False):
+    """ Copy file contents, permission bits and times from name in dir_fd to dst_file.
+
+    Args:
+        name (str): Source file name.
+        dir_fd (int): File descriptor of the source directory.
+        dst_file (str): Destination file path.
+        reflink (bool | False): Try a copy-on-write clone before copying.
+
+    Returns:
+        None
+    """
+    src_fd = os.open(name, os.O_RDONLY, dir_fd=dir_fd)
+    try:
+        src_stat = os.fstat(src_fd)
+        dst_fd = os.open(dst_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, stat.S_IMODE(src_stat.st_mode))
+        try:
+            os.fchmod(dst_fd, stat.S_IMODE(src_stat.st_mode))  # the os.open mode is masked by umask
+
+            remaining = 0 if reflink and _clone_fd(src_fd, dst_fd) else src_stat.st_size
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                    if not copied:  # some filesystems report 0 without copying anything
+                        break
+                    remaining -= copied
+            except OSError:  # not supported between these filesystems
+                pass
+
+            if remaining > 0:
+                # copy_file_range didn't finish, copy the rest from where it stopped
+                with open(src_fd, "rb", closefd=False) as src_fh, open(dst_fd, "wb", closefd=False) as dst_fh:
+                    shutil.copyfileobj(src_fh, dst_fh)
+
+            os.utime(dst_fd, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+
+def _robocopy_directory(src, dst, symlinks=False):
+    """ Copy directory with robocopy's multi-threaded copy.
+
+    Args:
+        src (str): Path to copy from.
+        dst (str): Path to copy to.
+        symlinks (bool | False): Copy symbolic links as links instead of their targets.
+
+    Returns:
+        True if robocopy ran and reported success.
+    """
+    # /R:0 /W:0, fail on locked files instead of robocopy's default million retries 30 seconds apart
+    cmd = ["robocopy", src, dst, "/E", "/MT:16", "/R:0", "/W:0", "/NFL", "/NDL", "/NJH", "/NJS", "/NP"]
+    if symlinks:
+        cmd.append("/SL")
+
+    try:
+        with open(os.devnull, "w") as devnull:
+            return_code = subprocess.call(cmd, stdout=devnull, stderr=devnull,
+                                          creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+    except OSError as e:
+        log.warning("robocopy unavailable, copying with python: {}".format(e))
+        return False
+
+    # robocopy return codes 0-7 are success, 8 and above mean something failed to copy
+    if return_code >= 8:
+        log.warning("robocopy failed with code {}, copying with python".format(return_code))
+        return False
+    return True
 
 
 '''
 def check_script_tree_in_focus():
+    from Qt import QtWidgets
+
     script_tree_is_in_focus = False
 
     valid_tab_texts = (ScriptTreeConstants.window_text, "Script Editor")
@@ -217,6 +651,8 @@ def create_script_tree_hotkey(shortcut_seq=None, command=None, *args, **kwargs):
     if not command:
         return
 
+    from Qt import QtGui, QtWidgets
+
     shortcut = QtWidgets.QShortcut(QtGui.QKeySequence.fromString(shortcut_seq), ui_utils.get_app_window())
     shortcut.setContext(QtCore.Qt.ApplicationShortcut)
 
@@ -236,6 +672,8 @@ def script_tree_command(cmd, non_specific_command):
 
 
 def non_specific_hotkey(shortcut, shortcut_seq):
+    from Qt import QtGui
+
     shortcut.setEnabled(0)
 
     key_str = shortcut_seq.split("+")[-1]
@@ -3,7 +3,9 @@
 # Standard
 import functools
 import os
+import pathlib
 import sys
+import weakref
 
 if sys.version_info[0] >= 3:
     long = int
@@ -13,11 +15,15 @@ from Qt import QtCore, QtGui, QtWidgets
 from script_tree.logger import log
 
 UI_FILES_FOLDER = os.path.dirname(__file__)
-ICON_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), "icons")
+ICON_FOLDER = pathlib.Path(__file__).parent.parent / "icons"
 
+# context menus built by build_menu_from_action_list, id(actions) -> (actions, QMenu).
+# Entries are dropped once their menu has been deleted along with its parent.
+_menu_cache = {}
 
-def maya_check():
-    """ Add a simple way to check if we are using maya or not.
+
+def _probe_maya():
+    """ Check if maya.cmds can be imported.
 
     Returns:
         True if maya is the current DCC
@@ -31,12 +37,56 @@ def maya_check():
         return False
 
 
+# The DCC can't change mid-process, so only probe once
+_IS_MAYA = _probe_maya()
+
+# DCC main window, set by get_app_window
+_TOP_WINDOW = None
+
+# Last window created per class, for delete_window. Kept across module reloads.
+if "_created_windows" not in globals():
+    _created_windows = weakref.WeakValueDictionary()
+
+
+def maya_check():
+    """ Add a simple way to check if we are using maya or not.
+
+    Returns:
+        True if maya is the current DCC
+    """
+    return _IS_MAYA
+
+
+def is_valid_widget(widget):
+    """ Check that the C++ object behind a widget still exists.
+
+    Args:
+        widget (QtWidgets.QWidget | None): Widget to check.
+
+    Returns:
+        True if widget can still be used.
+    """
+    if widget is None:
+        return False
+    try:
+        widget.objectName()
+    except RuntimeError:
+        return False
+    return True
+
+
 def get_app_window():
     """ Get top window of DCC
 
+    The window lives as long as the DCC does, so it is looked up once and cached in _TOP_WINDOW.
+
     Returns:
         Qt Widget
     """
+    global _TOP_WINDOW
+    if is_valid_widget(_TOP_WINDOW):
+        return _TOP_WINDOW
+
     top_window = None
     if maya_check():
         try:
@@ -44,7 +94,6 @@ def get_app_window():
             from maya import OpenMayaUI as omui
             maya_main_window_ptr = omui.MQtUtil().mainWindow()
             top_window = wrapInstance(long(maya_main_window_ptr), QtWidgets.QWidget)
-            return top_window
         except ImportError as e:
             pass
 
@@ -52,43 +101,48 @@ def get_app_window():
         # Motionbuilder
         from pyfbsdk import FBSystem
 
-        mb_window = None
+        window_titles = ("MotionBuilder 20" + str(FBSystem().Version)[0:2], "MotionBuilder 2017", "Untitled")
+
         app = QtWidgets.QApplication.instance()
         for widget in app.topLevelWidgets():
-            if ("MotionBuilder 20" + str(FBSystem().Version)[0:2]) in widget.windowTitle() \
-                    or "MotionBuilder 2017" in widget.windowTitle() \
-                    or "Untitled" in widget.windowTitle():
-                mb_window = widget
+            if not widget.isWindow():
+                continue
+            widget_title = widget.windowTitle()
+            if any(title in widget_title for title in window_titles):
+                top_window = widget
                 break
 
-        if mb_window is None:
+        if top_window is None:
             log.warning("No motionbuilder window instance found")
-        else:
-            return mb_window
 
+    _TOP_WINDOW = top_window
     return top_window
 
 
 def delete_window(object_to_delete):
     """ Delete window
 
+    Deletes the previously created window of the same class as object_to_delete and remembers
+    object_to_delete as the current one, so nothing has to scan every top level widget.
+
     Args:
         object_to_delete (QWidget): Widget to delete.
 
     Returns:
         None
     """
-    qApp = QtWidgets.QApplication.instance()
-    if not qApp:
-        return
+    # class path as the key so instances from before a module reload are still found
+    window_key = str(object_to_delete.__class__)
 
-    for widget in qApp.topLevelWidgets():
-        if "__class__" in dir(widget):
-            if str(widget.__class__) == str(object_to_delete.__class__):
-                widget.deleteLater()
-                widget.close()
+    existing_window = _created_windows.get(window_key)
+    if existing_window is not object_to_delete and is_valid_widget(existing_window):
+        existing_window.deleteLater()
+        existing_window.close()
 
+    _created_windows[window_key] = object_to_delete
 
+
+@functools.lru_cache(maxsize=256)
 def create_qicon(icon_name):
     """ Create QIcon.
 
@@ -98,25 +152,23 @@ def create_qicon(icon_name):
     Returns:
         QtGui.QIcon if icon exists else none.
     """
-    icon_path = os.path.join(ICON_FOLDER, icon_name)  # find in icons folder if not full path
-    if not os.path.exists(icon_path):
-        return
-
-    return QtGui.QIcon(icon_path)
+    icon_path = str(ICON_FOLDER / icon_name)  # find in icons folder if not full path
 
+    # QIcon is null for missing files, so no separate exists check
+    icon = QtGui.QIcon(icon_path)
+    if icon.isNull():
+        return
 
-class WindowHandler(object):
-    pass
+    return icon
 
 
-wh = WindowHandler()
+# Dockable widget instances, docking_object_name -> DockableWidget
+_widget_registry = {}
 
 # Setup dockable widget for Maya
 if maya_check():
 
     from maya.app.general.mayaMixin import MayaQWidgetDockableMixin
-    from maya import OpenMayaUI as omui
-    from maya import cmds
 
 
     class DockableWidget(MayaQWidgetDockableMixin, QtWidgets.QMainWindow):
@@ -160,9 +212,11 @@ if maya_check():
         Returns:
             Class of widget instance
         """
+        from maya import OpenMayaUI as omui
+        from maya import cmds
+
         if force_refresh:
-            if widget_class.docking_object_name in wh.__dict__.keys():
-                wh.__dict__.pop(widget_class.docking_object_name)
+            _widget_registry.pop(widget_class.docking_object_name, None)
 
             workspace_control_name = widget_class.docking_object_name + "WorkspaceControl"
             if cmds.workspaceControl(workspace_control_name, q=True, exists=True):
@@ -173,12 +227,12 @@ if maya_check():
             # Grab the created workspace control with the following.
             restored_control = omui.MQtUtil.getCurrentParent()
 
-        widget_instance = wh.__dict__.get(widget_class.docking_object_name)
+        widget_instance = _widget_registry.get(widget_class.docking_object_name)
 
         if widget_instance is None:
             # Create a custom mixin widget for the first time
             widget_instance = widget_class()  # type: DockableWidget
-            wh.__dict__[widget_class.docking_object_name] = widget_instance
+            _widget_registry[widget_class.docking_object_name] = widget_instance
 
         if restore:
             # Add custom mixin widget to the workspace control
@@ -241,19 +295,33 @@ else:
         return widget_instance
 
 
-def build_menu_from_action_list(actions, menu=None, is_sub_menu=False):
+def build_menu_from_action_list(actions, menu=None, is_sub_menu=False, parent=None):
     """ Build menu action list.
 
     Args:
         actions (list): list of strings of actions.
         menu (QMenu | None): Qmenu to add object to.
         is_sub_menu (Bool | False): if menu is a sub menu.
+        parent (QWidget | None): Widget owning the new menu, the cached menu is deleted along with it.
 
     Returns:
         QMenu with actions.
     """
+    if not menu and not is_sub_menu:
+        # forget menus deleted along with their parent window
+        for cache_key, (_, cached_menu) in list(_menu_cache.items()):
+            if not is_valid_widget(cached_menu):
+                del _menu_cache[cache_key]
+
+        # reuse the menu built for this action list last time, only the radio check state needs refreshing
+        cached_actions, cached_menu = _menu_cache.get(id(actions), (None, None))
+        if cached_actions is actions:
+            cached_menu.exec_(QtGui.QCursor().pos())
+            return cached_menu
+
     if not menu:
-        menu = QtWidgets.QMenu()
+        menu = QtWidgets.QMenu(parent)
+        _menu_cache[id(actions)] = (actions, menu)
 
     for action in actions:
         if action == "-":
@@ -269,30 +337,29 @@ def build_menu_from_action_list(actions, menu=None, is_sub_menu=False):
                 default_choice = action_command.get("default")  # type: str
                 on_trigger_command = action_command.get("on_trigger_command")  # function to trigger after setting value
 
-                # Has choice been defined in settings?
-                item_to_check = settings_obj.value(settings_key)
-
-                # If not, read from default option argument
-                if not item_to_check:
-                    item_to_check = default_choice
+                set_choice_command = functools.partial(set_settings_value, settings_obj, settings_key)
 
                 grp = QtWidgets.QActionGroup(menu)
+                radio_actions = []
                 for choice_key in choices:
                     action = QtWidgets.QAction(choice_key, menu)
                     action.setCheckable(True)
 
-                    if choice_key == item_to_check:
-                        action.setChecked(True)
-
-                    action.triggered.connect(functools.partial(set_settings_value,
-                                                               settings_obj,
-                                                               settings_key,
-                                                               choice_key,
-                                                               on_trigger_command))
+                    action.triggered.connect(functools.partial(set_choice_command, choice_key, on_trigger_command))
                     menu.addAction(action)
                     grp.addAction(action)
+                    radio_actions.append(action)
 
                 grp.setExclusive(True)
+
+                refresh_command = functools.partial(_refresh_radio_actions,
+                                                    settings_obj,
+                                                    settings_key,
+                                                    default_choice,
+                                                    choices,
+                                                    radio_actions)
+                refresh_command()
+                menu.aboutToShow.connect(refresh_command)
                 continue
 
             if isinstance(action_command, list):
@@ -310,6 +377,29 @@ def build_menu_from_action_list(actions, menu=None, is_sub_menu=False):
     return menu
 
 
+def _refresh_radio_actions(settings_obj, settings_key, default_choice, choices, radio_actions):
+    """ Check the radio action matching the current settings value.
+
+    Args:
+        settings_obj (QtCore.QSettings): QSetting.
+        settings_key (str): Setting name.
+        default_choice (str): Choice to check if the setting isn't defined.
+        choices (list): Choice names.
+        radio_actions (list): QActions in the same order as choices.
+
+    Returns:
+        None
+    """
+    # Has choice been defined in settings? If not, read from default option argument
+    item_to_check = settings_obj.value(settings_key)
+    if not item_to_check:
+        item_to_check = default_choice
+
+    checked_idx = choices.index(item_to_check) if item_to_check in choices else -1
+    for i, action in enumerate(radio_actions):
+        action.setChecked(i == checked_idx)
+
+
 def set_settings_value(settings_obj, key, value, post_set_command):
     """ Set settings value.
 